@@ -3,6 +3,7 @@ Streamlined configuration for OpenRouter-based Echoes backend.
 """
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
+from functools import cached_property
 from typing import List
 from pathlib import Path
 
@@ -49,6 +50,9 @@ class Settings(BaseSettings):
     llm_max_tokens: int = Field(default=2000, env="LLM_MAX_TOKENS")
     llm_timeout: int = Field(default=60, env="LLM_TIMEOUT")
     llm_max_retries: int = Field(default=3, env="LLM_MAX_RETRIES")
+    llm_max_concurrency: int = Field(default=4, env="LLM_MAX_CONCURRENCY")
+    # Output ceiling for one batch completion; bigger batches are split
+    llm_batch_max_tokens: int = Field(default=8000, env="LLM_BATCH_MAX_TOKENS")
     
     @field_validator("openrouter_api_key")
     @classmethod
@@ -68,6 +72,25 @@ class Settings(BaseSettings):
         env="SENTENCE_TRANSFORMER_MODEL"
     )
     
+    preload_model: bool = Field(default=True, env="PRELOAD_MODEL")
+    
+    # "torch" (SentenceTransformer) or "onnx_int8" (scripts/quantize_model.py)
+    embedding_backend: str = Field(default="torch", env="EMBEDDING_BACKEND")
+    onnx_model_dir: str = Field(default="onnx_int8", env="ONNX_MODEL_DIR")
+    
+    @field_validator("embedding_backend")
+    @classmethod
+    def validate_embedding_backend(cls, v: str) -> str:
+        """Validate the embedding backend name."""
+        v = v.strip().lower()
+        if v not in ("torch", "onnx_int8"):
+            raise ValueError("EMBEDDING_BACKEND must be 'torch' or 'onnx_int8'")
+        return v
+    
+    # Micro-batching of concurrent encode requests
+    embed_max_batch: int = Field(default=32, env="EMBED_MAX_BATCH")
+    embed_max_wait_ms: float = Field(default=5.0, env="EMBED_MAX_WAIT_MS")
+    
     # ============================================
     # Data Paths
     # ============================================
@@ -80,12 +103,25 @@ class Settings(BaseSettings):
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     log_file: str = Field(default="logs/echoes.log", env="LOG_FILE")
     
+    # Validate /timeline payloads against TimelineResponse (debugging aid)
+    validate_responses: bool = Field(default=False, env="VALIDATE_RESPONSES")
+    
     # ============================================
     # Feature Flags
     # ============================================
     use_llm_etymology: bool = Field(default=True, env="USE_LLM_ETYMOLOGY")
     cache_llm_responses: bool = Field(default=True, env="CACHE_LLM_RESPONSES")
     
+    # ============================================
+    # LLM Response Cache
+    # ============================================
+    # Empty REDIS_URL uses the local file cache
+    redis_url: str = Field(default="", env="REDIS_URL")
+    llm_cache_dir: str = Field(default=".cache/llm", env="LLM_CACHE_DIR")
+    llm_cache_ttl: int = Field(default=7 * 24 * 3600, env="LLM_CACHE_TTL")
+    llm_semantic_cache: bool = Field(default=False, env="LLM_SEMANTIC_CACHE")
+    llm_semantic_threshold: float = Field(default=0.95, env="LLM_SEMANTIC_THRESHOLD")
+    
     # ============================================
     # Constants
     # ============================================
@@ -93,6 +129,8 @@ class Settings(BaseSettings):
     MAX_TOP_N: int = 50
     DEFAULT_EXAMPLES_PER_ERA: int = 5
     MAX_EXAMPLES_PER_ERA: int = 20
+    MAX_BATCH_WORDS: int = 10
+    CONCEPT_CACHE_SIZE: int = 1024
     
     class Config:
         env_file = ".env"
@@ -102,15 +140,16 @@ class Settings(BaseSettings):
     # ============================================
     # Path Properties
     # ============================================
-    @property
+    # Built once per settings instance; embeddings_path is hit on every request
+    @cached_property
     def embeddings_path(self) -> Path:
         return Path(self.embeddings_dir)
     
-    @property
+    @cached_property
     def data_path(self) -> Path:
         return Path(self.data_dir)
     
-    @property
+    @cached_property
     def log_path(self) -> Path:
         return Path(self.log_file)
     
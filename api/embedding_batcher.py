@@ -0,0 +1,130 @@
+"""
+Micro-batching for sentence transformer encodes.
+Coalesces concurrent single-text requests into one forward pass and
+keeps all model work off the event loop.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Queue single-text encodes and run them as batches in a worker thread."""
+
+    def __init__(
+        self,
+        model_getter: Callable[[], Any],
+        max_batch: int = 32,
+        max_wait: float = 0.005
+    ):
+        """
+        Args:
+            model_getter: Returns the (lazily loaded) SentenceTransformer
+            max_batch: Maximum texts per forward pass
+            max_wait: Seconds to wait for more texts after the first arrives
+        """
+        self._get_model = model_getter
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        # A single worker serializes model access; torch parallelizes internally
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encode")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background batching task on the running loop."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Embedding batcher started (max_batch={self.max_batch}, "
+            f"max_wait={self.max_wait * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        """Cancel the batching task and shut down the worker thread."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Encode one text, sharing a forward pass with concurrent callers."""
+        if self._task is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def encode_many(self, texts: List[str]) -> np.ndarray:
+        """Encode an already-batched list of texts in the worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode_batch, texts)
+
+    def encode_blocking(self, text: str) -> np.ndarray:
+        """
+        Encode one text from a non-event-loop thread, e.g. inside asyncio.to_thread.
+
+        Runs on the same worker as batched encodes, so the model is never
+        used from two threads at once. Must not be called from that worker.
+        """
+        return self._executor.submit(self._encode_batch, [text]).result()[0]
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        model = self._get_model()
+        return model.encode(
+            texts,
+            batch_size=self.max_batch,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch fills or max_wait passes."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+
+            try:
+                embs = await loop.run_in_executor(self._executor, self._encode_batch, texts)
+            except Exception as e:
+                logger.error(f"Batch encode of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # Callers may have gone away (client disconnects cancel the future)
+            for (_, future), emb in zip(batch, embs):
+                if not future.done():
+                    future.set_result(emb)
@@ -2,58 +2,144 @@
 Streamlined etymology service using OpenRouter API.
 Includes retry logic, caching, and proper error handling.
 """
+import asyncio
 import logging
-import json
-from typing import List, Dict, Any
+import re
 from functools import lru_cache
-from openai import OpenAI
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+import httpx
+import orjson
+from openai import AsyncOpenAI
 from tenacity import (
-    retry,
+    AsyncRetrying,
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type
 )
 
 from api.config import settings
+from api.llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
+# Markdown code fence around a JSON payload, e.g. ```json\n{...}\n```
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*\n(.*?)\n\s*```\s*$", re.DOTALL)
+
+# Rough completion size of a batch response: a 10-30 word example plus
+# JSON quoting, and the keys/brackets around each era and word
+_TOKENS_PER_EXAMPLE = 45
+_TOKENS_PER_ERA = 10
+_TOKENS_PER_WORD = 10
+
+
+def _estimate_batch_tokens(num_words: int, num_eras: int, num_examples: int) -> int:
+    """Upper estimate of the completion tokens a batch response needs."""
+    per_word = _TOKENS_PER_WORD + num_eras * (_TOKENS_PER_ERA + num_examples * _TOKENS_PER_EXAMPLE)
+    return num_words * per_word + _TOKENS_PER_WORD
+
 
 class OpenRouterError(Exception):
     """Custom exception for OpenRouter API errors."""
     pass
 
 
-class EtymologyService:
-    """Service for generating word evolution data using OpenRouter."""
+class JSONStreamScanner:
+    """
+    Incrementally scan a streamed JSON object.
+    
+    Tracks brace depth (ignoring braces inside strings) so callers can stop
+    reading as soon as the top-level object closes, and reports each
+    top-level member as soon as its value is complete. Text before the
+    opening brace, such as a markdown fence, is skipped.
+    """
     
     def __init__(self):
-        """Initialize OpenRouter client."""
-        self.client = OpenAI(
-            api_key=settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        self.model = settings.openrouter_model
+        self.text = ""
+        self.complete = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._member_start: Optional[int] = None
+    
+    @property
+    def json_text(self) -> str:
+        """The scanned object, or everything received if it never closed."""
+        if self._start is None:
+            return self.text
+        end = self._end if self._end is not None else len(self.text)
+        return self.text[self._start:end]
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Append a chunk and return the top-level members it completed."""
+        self.text += chunk
+        members = []
         
-        # Headers for OpenRouter
-        self.extra_headers = {
-            "HTTP-Referer": settings.openrouter_site_url,
-            "X-Title": settings.openrouter_app_name,
-        }
+        while self._pos < len(self.text) and not self.complete:
+            c = self.text[self._pos]
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._start = self._pos
+                    self._member_start = self._pos + 1
+            elif c in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 1 and self._member_start is not None:
+                    member = self._parse_member(self.text[self._member_start:self._pos + 1])
+                    if member is not None:
+                        members.append(member)
+                    self._member_start = None
+                elif self._depth == 0:
+                    self._end = self._pos + 1
+                    self.complete = True
+            elif c == "," and self._depth == 1:
+                self._member_start = self._pos + 1
+            
+            self._pos += 1
         
-        logger.info(f"Initialized OpenRouter with model: {self.model}")
+        return members
     
-    def _build_prompt(self, word: str, eras: List[str], num_examples: int) -> str:
-        """Build the LLM prompt for word evolution analysis."""
-        return f"""Analyze how the word "{word}" evolved across different time periods.
+    @staticmethod
+    def _parse_member(fragment: str) -> Optional[Tuple[str, Any]]:
+        try:
+            data = orjson.loads("{" + fragment + "}")
+        except orjson.JSONDecodeError:
+            logger.debug(f"Unparseable streamed member: {fragment[:200]}")
+            return None
+        return next(iter(data.items()), None)
 
-For each era below, provide {num_examples} contextual examples that show how people understood and used this word during that period. Focus on:
+
+# ============================================
+# Prompt templates
+# ============================================
+# Constant chunks are joined around the request values; braces are literal.
+_ERAS_SEP = ", "
+
+_PROMPT_HEAD = 'Analyze how the word "'
+_PROMPT_MID = '''" evolved across different time periods.
+
+For each era below, provide '''
+_PROMPT_ERAS = ''' contextual examples that show how people understood and used this word during that period. Focus on:
 - Semantic changes and shifts in meaning
 - Cultural context and connotations
 - Historical usage patterns
 - Notable differences from other eras
 
-Eras: {", ".join(eras)}
+Eras: '''
+_PROMPT_TAIL = '''
 
 Requirements:
 - Each example should be a complete phrase or short sentence (10-30 words)
@@ -62,7 +148,7 @@ Requirements:
 - Be historically accurate and specific
 
 Format as valid JSON only (no markdown, no preamble):
-{{
+{
   "1900s": [
     "example 1 showing meaning/context",
     "example 2 showing meaning/context",
@@ -72,106 +158,412 @@ Format as valid JSON only (no markdown, no preamble):
     "example 1 showing meaning/context",
     ...
   ]
-}}"""
+}'''
+
+_BATCH_PROMPT_HEAD = '''Analyze how each of the following words evolved across different time periods.
+
+Words: '''
+_BATCH_PROMPT_MID = '''
+
+For each word and each era below, provide '''
+_BATCH_PROMPT_ERAS = ''' contextual examples that show how people understood and used the word during that period. Focus on:
+- Semantic changes and shifts in meaning
+- Cultural context and connotations
+- Historical usage patterns
+- Notable differences from other eras
+
+Eras: '''
+_BATCH_PROMPT_TAIL = '''
+
+Requirements:
+- Each example should be a complete phrase or short sentence (10-30 words)
+- Show authentic period-appropriate usage
+- Capture the essence of how meaning changed
+- Be historically accurate and specific
+- Use each word exactly as given (lowercase) as the top-level key
+
+Format as valid JSON only (no markdown, no preamble):
+{
+  "word1": {
+    "1900s": [
+      "example 1 showing meaning/context",
+      ...
+    ],
+    "2020s": [
+      "example 1 showing meaning/context",
+      ...
+    ]
+  },
+  "word2": {
+    ...
+  }
+}'''
+
+
+@lru_cache(maxsize=256)
+def _render_prompt(word: str, eras: tuple, num_examples: int) -> str:
+    """Render the single-word prompt (pure, so results are cached)."""
+    return "".join((
+        _PROMPT_HEAD, word,
+        _PROMPT_MID, str(num_examples),
+        _PROMPT_ERAS, _ERAS_SEP.join(eras),
+        _PROMPT_TAIL,
+    ))
+
+
+@lru_cache(maxsize=256)
+def _render_batch_prompt(words: tuple, eras: tuple, num_examples: int) -> str:
+    """Render the multi-word batch prompt (pure, so results are cached)."""
+    return "".join((
+        _BATCH_PROMPT_HEAD, _ERAS_SEP.join(f'"{w}"' for w in words),
+        _BATCH_PROMPT_MID, str(num_examples),
+        _BATCH_PROMPT_ERAS, _ERAS_SEP.join(eras),
+        _BATCH_PROMPT_TAIL,
+    ))
+
+
+class EtymologyService:
+    """Service for generating word evolution data using OpenRouter."""
+    
+    def __init__(self):
+        """Initialize OpenRouter client."""
+        # One pooled HTTP/2 client: concurrent calls multiplex over a
+        # single TLS connection instead of handshaking per request
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=settings.llm_timeout
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.openrouter_api_key,
+            base_url="https://openrouter.ai/api/v1",
+            http_client=self._http,
+            max_retries=0  # retries are handled by _call_openrouter
+        )
+        self.model = settings.openrouter_model
+        
+        # Headers for OpenRouter
+        self.extra_headers = {
+            "HTTP-Referer": settings.openrouter_site_url,
+            "X-Title": settings.openrouter_app_name,
+        }
+        
+        self.cache = LLMCache(self.model)
+        
+        # Bounds concurrent OpenRouter calls across all requests
+        self._semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        
+        # Cache key -> task running the LLM call currently fetching it
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        logger.info(f"Initialized OpenRouter with model: {self.model}")
+        logger.info(f"LLM response cache backend: {self.cache.backend}")
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self._http.aclose()
+    
+    def _build_prompt(self, word: str, eras: List[str], num_examples: int) -> str:
+        """Build the LLM prompt for word evolution analysis."""
+        return _render_prompt(word, tuple(eras), num_examples)
+    
+    def _build_batch_prompt(self, words: List[str], eras: List[str], num_examples: int) -> str:
+        """Build a single LLM prompt covering several words at once."""
+        return _render_batch_prompt(tuple(words), tuple(eras), num_examples)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((OpenRouterError, TimeoutError)),
-        reraise=True
-    )
-    def _call_openrouter(self, prompt: str) -> str:
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for an evolution prompt."""
+        return [
+            {
+                "role": "system",
+                "content": "You are a historical linguist and etymologist specializing in semantic evolution. Respond ONLY with valid JSON."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    async def _stream_openrouter(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
         """
-        Call OpenRouter API with retry logic.
+        Yield content deltas from a streamed OpenRouter completion.
+        
+        Closing this generator early closes the HTTP stream, so the
+        model stops generating (and billing) tokens nobody will read.
+        ``max_tokens`` defaults to ``settings.llm_max_tokens``.
         
         Raises:
-            OpenRouterError: If API call fails after retries
+            OpenRouterError: If the API call or stream fails
             TimeoutError: If request times out
         """
         try:
-            response = self.client.chat.completions.create(
+            stream = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a historical linguist and etymologist specializing in semantic evolution. Respond ONLY with valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._messages(prompt),
                 temperature=settings.llm_temperature,
-                max_tokens=settings.llm_max_tokens,
+                max_tokens=max_tokens or settings.llm_max_tokens,
                 timeout=settings.llm_timeout,
-                extra_headers=self.extra_headers
+                extra_headers=self.extra_headers,
+                stream=True
             )
-            
-            content = response.choices[0].message.content
-            
-            if not content:
-                raise OpenRouterError("Empty response from OpenRouter")
-            
-            return content
-        
         except TimeoutError as e:
             logger.error(f"OpenRouter request timed out: {e}")
             raise
-        
         except Exception as e:
             logger.error(f"OpenRouter API error: {e}")
             raise OpenRouterError(f"API call failed: {str(e)}")
+        
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except TimeoutError as e:
+            logger.error(f"OpenRouter stream timed out: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"OpenRouter stream error: {e}")
+            raise OpenRouterError(f"Stream failed: {str(e)}")
+        finally:
+            await stream.close()
     
-    def _parse_response(self, content: str) -> Dict[str, List[str]]:
+    async def _call_openrouter(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Call OpenRouter API with retry logic.
+        
+        Retries up to ``settings.llm_max_retries`` times with exponential
+        backoff. AsyncRetrying waits with asyncio.sleep, so a failing call
+        never blocks the event loop for other requests. Each attempt takes
+        a slot of ``settings.llm_max_concurrency``.
+        
+        Raises:
+            OpenRouterError: If API call fails after retries
+            TimeoutError: If request times out
+        """
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(settings.llm_max_retries + 1),  # first try + retries
+            wait=wait_exponential(multiplier=1, min=2, max=10),
+            retry=retry_if_exception_type((OpenRouterError, TimeoutError)),
+            reraise=True
+        ):
+            with attempt:
+                # Held per attempt, so backoff sleeps don't occupy a slot
+                async with self._semaphore:
+                    return await self._read_completion(prompt, max_tokens)
+    
+    async def _read_completion(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Stream one completion, stopping once the top-level JSON object closes.
+        
+        Raises:
+            OpenRouterError: If the call fails or the response is empty
+            TimeoutError: If request times out
+        """
+        scanner = JSONStreamScanner()
+        stream = self._stream_openrouter(prompt, max_tokens)
+        try:
+            async for delta in stream:
+                scanner.feed(delta)
+                if scanner.complete:
+                    break
+        finally:
+            await stream.aclose()
+        
+        content = scanner.json_text
+        
+        if not content.strip():
+            raise OpenRouterError("Empty response from OpenRouter")
+        
+        return content
+    
+    @staticmethod
+    def _validate_eras(data: Dict[str, Any]) -> None:
+        """Ensure all values of an era mapping are lists of strings."""
+        for era, examples in data.items():
+            if not isinstance(examples, list):
+                raise ValueError(f"Era '{era}' does not contain a list")
+            if not all(isinstance(ex, str) for ex in examples):
+                raise ValueError(f"Era '{era}' contains non-string examples")
+    
+    def _parse_response(self, content: str, nested: bool = False) -> Dict[str, Any]:
         """
         Parse LLM response, handling markdown code blocks.
         
+        Args:
+            content: Raw LLM response
+            nested: Expect a {word: {era: [...]}} mapping (batch prompts)
+        
         Returns:
-            Dict mapping era to list of examples
+            Dict mapping era to list of examples, or word to such a dict
+            when ``nested`` is set
         
         Raises:
             ValueError: If response is not valid JSON
         """
-        # Remove markdown code blocks if present
-        content = content.strip()
-        
-        if content.startswith("```"):
-            lines = content.split("\n")
-            # Remove first and last lines (``` markers)
-            content = "\n".join(lines[1:-1])
-            # Remove 'json' language marker if present
-            if content.startswith("json"):
-                content = content[4:].strip()
-        
         try:
-            data = json.loads(content)
+            # Fast path: the system prompt asks for bare JSON
+            try:
+                data = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # Remove markdown code blocks if present
+                match = _FENCE_RE.match(content)
+                if match is None:
+                    raise
+                data = orjson.loads(match.group(1))
             
             # Validate structure
             if not isinstance(data, dict):
                 raise ValueError("Response is not a JSON object")
             
             # Ensure all values are lists of strings
-            for era, examples in data.items():
-                if not isinstance(examples, list):
-                    raise ValueError(f"Era '{era}' does not contain a list")
-                if not all(isinstance(ex, str) for ex in examples):
-                    raise ValueError(f"Era '{era}' contains non-string examples")
+            if nested:
+                for word, eras in data.items():
+                    if not isinstance(eras, dict):
+                        raise ValueError(f"Word '{word}' does not contain an era object")
+                    self._validate_eras(eras)
+            else:
+                self._validate_eras(data)
             
             return data
         
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
             logger.debug(f"Raw content: {content[:500]}")
             raise ValueError(f"Invalid JSON response: {str(e)}")
     
-    @lru_cache(maxsize=100)
-    def _cached_generation(self, word: str, eras_tuple: tuple, num_examples: int) -> str:
-        """Cached API call (eras as tuple for hashability)."""
-        eras = list(eras_tuple)
-        prompt = self._build_prompt(word, eras, num_examples)
-        return self._call_openrouter(prompt)
+    def _cache_params(self, word: str, eras: List[str], num_examples: int) -> Tuple[str, str, str]:
+        """Cache key, semantic text and scope for a single-word request."""
+        key = self.cache.cache_key(word=word, eras=sorted(eras), n=num_examples)
+        # Eras belong in the scope, not the embedded text: requests that differ
+        # only by era embed almost identically and must never match each other
+        semantic_text = word
+        scope = f"single|{num_examples}|{','.join(sorted(eras))}"
+        return key, semantic_text, scope
     
-    def generate_word_evolution(
+    async def _coalesce(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run ``fetch`` once per key, however many callers ask concurrently.
+        
+        Callers arriving while a request for the same key is in flight
+        await its result instead of issuing their own LLM call. The fetch
+        runs in its own task, so cancelling any caller (the first one
+        included) never cancels the shared call for the others.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.info("Joining in-flight LLM request")
+        else:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+        
+        return await asyncio.shield(task)
+    
+    def _finish_inflight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+    
+    async def _cached_generation(self, word: str, eras: List[str], num_examples: int) -> Dict[str, List[str]]:
+        """
+        Cache-through API call for a single word.
+        
+        Only responses that parse successfully are stored, so a malformed
+        completion is never served again after a restart. Concurrent
+        identical requests share a single call.
+        """
+        key, semantic_text, scope = self._cache_params(word, eras, num_examples)
+        
+        async def fetch() -> Dict[str, List[str]]:
+            # Cache backends do blocking I/O, keep them off the event loop
+            content = await asyncio.to_thread(
+                self.cache.get, key, semantic_text=semantic_text, scope=scope
+            )
+            if content is not None:
+                logger.info(f"LLM cache hit for '{word}'")
+                return self._parse_response(content)
+            
+            prompt = self._build_prompt(word, eras, num_examples)
+            content = await self._call_openrouter(prompt)
+            result = self._parse_response(content)
+            await asyncio.to_thread(
+                self.cache.set, key, content, semantic_text=semantic_text, scope=scope
+            )
+            return result
+        
+        return await self._coalesce(key, fetch)
+    
+    async def _cached_batch_generation(
+        self,
+        words: List[str],
+        eras: List[str],
+        num_examples: int
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """Cache-through batch API call (exact tier only)."""
+        key = self.cache.cache_key(words=sorted(words), eras=sorted(eras), n=num_examples)
+        
+        async def fetch() -> Dict[str, Dict[str, List[str]]]:
+            content = await asyncio.to_thread(self.cache.get, key)
+            if content is not None:
+                logger.info(f"LLM cache hit for batch {words}")
+                return self._parse_response(content, nested=True)
+            
+            content = await self._call_batch(words, eras, num_examples)
+            result = self._parse_response(content, nested=True)
+            await asyncio.to_thread(self.cache.set, key, content)
+            return result
+        
+        return await self._coalesce(key, fetch)
+    
+    async def _call_batch(self, words: List[str], eras: List[str], num_examples: int) -> str:
+        """One batch completion, with max_tokens sized to the expected output."""
+        prompt = self._build_batch_prompt(words, eras, num_examples)
+        max_tokens = max(
+            settings.llm_max_tokens,
+            _estimate_batch_tokens(len(words), len(eras), num_examples)
+        )
+        return await self._call_openrouter(prompt, max_tokens)
+    
+    async def _generate_batch_chunk(
+        self,
+        words: List[str],
+        eras: List[str],
+        num_examples: int
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """Generate one sub-batch that fits in a single completion."""
+        if settings.cache_llm_responses:
+            return await self._cached_batch_generation(words, eras, num_examples)
+        content = await self._call_batch(words, eras, num_examples)
+        return self._parse_response(content, nested=True)
+    
+    def _validate_request(self, eras: List[str], num_examples: int) -> None:
+        """Validate the era list and example count shared by all entrypoints."""
+        if not eras:
+            raise ValueError("Must provide at least one era")
+        
+        if num_examples < 1 or num_examples > settings.MAX_EXAMPLES_PER_ERA:
+            raise ValueError(
+                f"num_examples must be between 1 and {settings.MAX_EXAMPLES_PER_ERA}"
+            )
+        
+        # Validate era format (basic check)
+        for era in eras:
+            if not era.strip():
+                raise ValueError(f"Invalid era: '{era}'")
+    
+    async def generate_word_evolution(
         self,
         word: str,
         eras: List[str],
@@ -198,18 +590,7 @@ Format as valid JSON only (no markdown, no preamble):
         
         word = word.strip().lower()
         
-        if not eras:
-            raise ValueError("Must provide at least one era")
-        
-        if num_examples < 1 or num_examples > settings.MAX_EXAMPLES_PER_ERA:
-            raise ValueError(
-                f"num_examples must be between 1 and {settings.MAX_EXAMPLES_PER_ERA}"
-            )
-        
-        # Validate era format (basic check)
-        for era in eras:
-            if not era.strip():
-                raise ValueError(f"Invalid era: '{era}'")
+        self._validate_request(eras, num_examples)
         
         logger.info(
             f"Generating evolution for '{word}' across {len(eras)} eras "
@@ -219,17 +600,11 @@ Format as valid JSON only (no markdown, no preamble):
         try:
             # Use cache if enabled
             if settings.cache_llm_responses:
-                content = self._cached_generation(
-                    word,
-                    tuple(eras),  # Convert to tuple for caching
-                    num_examples
-                )
+                result = await self._cached_generation(word, eras, num_examples)
             else:
                 prompt = self._build_prompt(word, eras, num_examples)
-                content = self._call_openrouter(prompt)
-            
-            # Parse response
-            result = self._parse_response(content)
+                content = await self._call_openrouter(prompt)
+                result = self._parse_response(content)
             
             # Validate we got data for all requested eras
             missing_eras = set(eras) - set(result.keys())
@@ -246,6 +621,193 @@ Format as valid JSON only (no markdown, no preamble):
         except (OpenRouterError, TimeoutError, ValueError) as e:
             logger.error(f"Failed to generate evolution for '{word}': {e}")
             raise
+    
+    async def _pump_stream(
+        self,
+        prompt: str,
+        scanner: JSONStreamScanner,
+        members: asyncio.Queue
+    ) -> None:
+        """
+        Feed a streamed completion into ``scanner``, queueing each member.
+        
+        Holds a concurrency slot only while reading from OpenRouter and
+        stops once the top-level object closes. ``None`` is queued last,
+        whether the stream finished or failed.
+        """
+        try:
+            async with self._semaphore:
+                stream = self._stream_openrouter(prompt)
+                try:
+                    async for delta in stream:
+                        for member in scanner.feed(delta):
+                            members.put_nowait(member)
+                        if scanner.complete:
+                            break
+                finally:
+                    await stream.aclose()
+        finally:
+            members.put_nowait(None)
+    
+    async def stream_word_evolution(
+        self,
+        word: str,
+        eras: List[str],
+        num_examples: int = 5
+    ) -> AsyncIterator[Tuple[str, List[str]]]:
+        """
+        Yield (era, examples) pairs as the LLM produces them.
+        
+        Cached responses are replayed immediately. A freshly streamed
+        response is cached once the full object has arrived and parses.
+        
+        Raises:
+            ValueError: If input validation fails
+            OpenRouterError: If the API call or stream fails
+        """
+        if not word or not word.strip():
+            raise ValueError("Word cannot be empty")
+        
+        word = word.strip().lower()
+        
+        self._validate_request(eras, num_examples)
+        
+        key, semantic_text, scope = self._cache_params(word, eras, num_examples)
+        
+        if settings.cache_llm_responses:
+            content = await asyncio.to_thread(
+                self.cache.get, key, semantic_text=semantic_text, scope=scope
+            )
+            if content is not None:
+                logger.info(f"LLM cache hit for '{word}' (stream)")
+                for era, examples in self._parse_response(content).items():
+                    yield era, examples
+                return
+        
+        logger.info(f"Streaming evolution for '{word}' across {len(eras)} eras")
+        
+        scanner = JSONStreamScanner()
+        # The upstream read runs in its own task so the concurrency slot is
+        # never held while a slow client consumes what we yield
+        members: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(
+            self._pump_stream(self._build_prompt(word, eras, num_examples), scanner, members)
+        )
+        try:
+            while (member := await members.get()) is not None:
+                era, examples = member
+                if not isinstance(examples, list) or not all(isinstance(ex, str) for ex in examples):
+                    logger.warning(f"Skipping malformed streamed era '{era}'")
+                    continue
+                yield era, examples
+            await producer  # re-raises upstream errors
+        finally:
+            producer.cancel()
+        
+        if not scanner.complete:
+            logger.warning(f"Stream for '{word}' ended before the JSON object closed")
+            return
+        
+        if settings.cache_llm_responses:
+            try:
+                self._parse_response(scanner.json_text)
+            except ValueError as e:
+                logger.warning(f"Not caching streamed response for '{word}': {e}")
+                return
+            await asyncio.to_thread(
+                self.cache.set, key, scanner.json_text, semantic_text=semantic_text, scope=scope
+            )
+    
+    async def generate_word_evolution_batch(
+        self,
+        words: List[str],
+        eras: List[str],
+        num_examples: int = 5
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Generate evolution data for several words in a single LLM call.
+        
+        Sharing one prompt amortizes the instruction preamble and the
+        network round-trip across all words in the batch. Words are split
+        into concurrent sub-batches whose expected output fits
+        ``settings.llm_batch_max_tokens``.
+        
+        Args:
+            words: Words to analyze
+            eras: List of time periods (e.g., ["1900s", "2020s"])
+            num_examples: Number of examples per era (1-20)
+        
+        Returns:
+            Dictionary mapping word to {era: [examples]}
+        
+        Raises:
+            ValueError: If input validation fails or response is invalid
+            OpenRouterError: If API call fails after retries
+        """
+        # Input validation
+        if not words:
+            raise ValueError("Must provide at least one word")
+        
+        if len(words) > settings.MAX_BATCH_WORDS:
+            raise ValueError(
+                f"Cannot batch more than {settings.MAX_BATCH_WORDS} words"
+            )
+        
+        normalized = []
+        for word in words:
+            if not word or not word.strip():
+                raise ValueError("Word cannot be empty")
+            word = word.strip().lower()
+            if word not in normalized:
+                normalized.append(word)
+        
+        self._validate_request(eras, num_examples)
+        
+        per_word = _estimate_batch_tokens(1, len(eras), num_examples)
+        words_per_call = settings.llm_batch_max_tokens // per_word
+        if words_per_call < 1:
+            raise ValueError(
+                f"{len(eras)} eras x {num_examples} examples needs ~{per_word} output "
+                f"tokens per word, over LLM_BATCH_MAX_TOKENS={settings.llm_batch_max_tokens}"
+            )
+        chunks = [
+            normalized[i:i + words_per_call]
+            for i in range(0, len(normalized), words_per_call)
+        ]
+        
+        logger.info(
+            f"Generating batched evolution for {len(normalized)} words across "
+            f"{len(eras)} eras ({num_examples} examples each) in {len(chunks)} call(s)"
+        )
+        
+        try:
+            parsed = {}
+            for part in await asyncio.gather(
+                *(self._generate_batch_chunk(chunk, eras, num_examples) for chunk in chunks)
+            ):
+                # Models occasionally echo keys with different casing
+                parsed.update({key.strip().lower(): value for key, value in part.items()})
+            
+            result = {}
+            for word in normalized:
+                if word not in parsed:
+                    logger.warning(f"Missing data for word: '{word}'")
+                    continue
+                missing_eras = set(eras) - set(parsed[word].keys())
+                if missing_eras:
+                    logger.warning(f"Missing data for '{word}' eras: {missing_eras}")
+                result[word] = parsed[word]
+            
+            logger.info(
+                f"Successfully generated batched evolution for "
+                f"{len(result)}/{len(normalized)} words"
+            )
+            
+            return result
+        
+        except (OpenRouterError, TimeoutError, ValueError) as e:
+            logger.error(f"Failed to generate batched evolution for {normalized}: {e}")
+            raise
 
 
 # Global service instance
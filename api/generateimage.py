@@ -1,8 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import os
+import re
+import asyncio
 import base64
-import requests
+import secrets
+import aiofiles
+import httpx
 from pathlib import Path
 
 # ---------------------------
@@ -10,6 +14,33 @@ from pathlib import Path
 # ---------------------------
 app = FastAPI(title="Image Generation API")
 
+# Runs of anything but ASCII letters/digits become a single "-" in filenames
+_SAFE_RE = re.compile(r"[^a-z0-9]+")
+
+# ---------------------------
+# Shared Banana HTTP client
+# ---------------------------
+BANANA_CLIENT = httpx.AsyncClient(
+    base_url="https://api.banana.dev",
+    timeout=60.0,  # timeout in seconds
+    limits=httpx.Limits(max_keepalive_connections=10)
+)
+
+@app.on_event("shutdown")
+async def close_banana_client():
+    await BANANA_CLIENT.aclose()
+
+async def _save_base64_image(path: Path, base64_img: str) -> None:
+    """Decode off the event loop, then write without blocking it."""
+    decoded = await asyncio.to_thread(base64.b64decode, base64_img)
+    async with aiofiles.open(path, "xb") as f:  # never overwrite an existing image
+        try:
+            await f.write(decoded)
+        except BaseException:
+            await f.close()
+            path.unlink(missing_ok=True)  # don't leave a truncated image behind
+            raise
+
 # ---------------------------
 # Request Model
 # ---------------------------
@@ -44,8 +75,8 @@ async def generate_image(req: GenerateImageRequest):
                 detail="Banana API keys are not configured in environment variables"
             )
 
-        response = requests.post(
-            "https://api.banana.dev/start/v4/",
+        response = await BANANA_CLIENT.post(
+            "/start/v4/",
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {banana_api_key}"
@@ -53,8 +84,7 @@ async def generate_image(req: GenerateImageRequest):
             json={
                 "modelKey": banana_model_key,
                 "modelInputs": {"prompt": req.prompt}
-            },
-            timeout=60  # timeout in seconds
+            }
         )
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail=f"Banana API error: {response.text}")
@@ -67,20 +97,13 @@ async def generate_image(req: GenerateImageRequest):
         # ---------------------------
         # Save image to public folder
         # ---------------------------
-        safe_name = "".join(c if c.isalnum() else "-" for c in req.prompt.lower())
+        safe_name = _SAFE_RE.sub("-", req.prompt.lower()).strip("-") or "image"
         folder = Path("public") / "images" / req.category
         folder.mkdir(parents=True, exist_ok=True)  # create folder if not exists
-        file_path = folder / f"{safe_name}.png"
-
-        # Avoid overwriting existing file
-        counter = 1
-        original_file_path = file_path
-        while file_path.exists():
-            file_path = folder / f"{safe_name}-{counter}.png"
-            counter += 1
+        # Random suffix avoids overwriting existing files without scanning the folder
+        file_path = folder / f"{safe_name}-{secrets.token_hex(4)}.png"
 
-        with open(file_path, "wb") as f:
-            f.write(base64.b64decode(base64_img))
+        await _save_base64_image(file_path, base64_img)
 
         # ---------------------------
         # Return public URL
@@ -0,0 +1,261 @@
+"""
+Persistent cache for raw LLM responses.
+Uses Redis when available (exact + optional semantic tier),
+falling back to a JSON file cache on local disk.
+"""
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from api.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+# The semantic tier needs the search commands; the exact tier never does
+try:
+    from redis.commands.search.field import TagField, VectorField
+    from redis.commands.search.query import Query
+    try:
+        from redis.commands.search.index_definition import IndexDefinition, IndexType
+    except ImportError:  # redis-py < 6.0
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+    HAS_REDIS_SEARCH = True
+except ImportError:  # pragma: no cover - optional
+    HAS_REDIS_SEARCH = False
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "echoes:llm:"
+SEMANTIC_PREFIX = "echoes:llm:sem:"
+SEMANTIC_INDEX = "echoes_llm_semantic"
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses.
+
+    The exact tier is keyed by a hash of the normalized request and lives in
+    Redis (or on disk when Redis is unreachable). The semantic tier stores an
+    embedding of the request next to the response and serves near-duplicate
+    requests via a Redis KNN search; it needs Redis with the search module
+    and an ``encoder`` callable.
+    """
+
+    def __init__(self, model: str, ttl: int = settings.llm_cache_ttl):
+        self.model = model
+        self.ttl = ttl
+        self.cache_dir = Path(settings.llm_cache_dir)
+        self.semantic_threshold = settings.llm_semantic_threshold
+
+        # Set by api.main once the sentence transformer is available
+        self.encoder: Optional[Callable[[str], np.ndarray]] = None
+
+        self._redis = self._connect()
+        self._index_ready = False
+
+        if settings.llm_semantic_cache and self._redis is not None and not HAS_REDIS_SEARCH:
+            logger.warning("LLM_SEMANTIC_CACHE is set but this redis-py lacks search support")
+
+        if self._redis is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def backend(self) -> str:
+        """Name of the active storage backend."""
+        return "redis" if self._redis is not None else "file"
+
+    def _connect(self):
+        """Connect to Redis, returning None if it is unavailable."""
+        if not settings.redis_url:
+            return None
+        if redis is None:
+            logger.warning("REDIS_URL is set but redis is not installed; using file cache")
+            return None
+
+        try:
+            client = redis.Redis.from_url(settings.redis_url)
+            client.ping()
+            logger.info(f"LLM cache connected to Redis at {settings.redis_url}")
+            return client
+        except redis.RedisError as e:
+            logger.warning(f"Redis unavailable ({e}); using file cache")
+            return None
+
+    def cache_key(self, **fields: Any) -> str:
+        """Build a stable key from request fields plus the model name."""
+        payload = dict(fields, model=self.model)
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+    def get(self, key: str, semantic_text: Optional[str] = None, scope: str = "") -> Optional[str]:
+        """
+        Return a cached response or None.
+
+        Args:
+            key: Exact-tier key from cache_key()
+            semantic_text: Request description used for the semantic tier
+            scope: Only semantic entries with the same scope can match
+        """
+        value = self._get_exact(key)
+        if value is not None:
+            return value
+
+        if semantic_text is not None and self._semantic_enabled():
+            return self._get_semantic(semantic_text, scope)
+
+        return None
+
+    def set(self, key: str, value: str, semantic_text: Optional[str] = None, scope: str = "") -> None:
+        """Store a response in the exact tier and, if enabled, the semantic tier."""
+        self._set_exact(key, value)
+
+        if semantic_text is not None and self._semantic_enabled():
+            self._set_semantic(key, value, semantic_text, scope)
+
+    # ============================================
+    # Exact tier
+    # ============================================
+    def _get_exact(self, key: str) -> Optional[str]:
+        if self._redis is not None:
+            try:
+                value = self._redis.get(KEY_PREFIX + key)
+                return value.decode("utf8") if value is not None else None
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache read failed: {e}")
+                return None
+
+        path = self.cache_dir / f"{key}.json"
+        if not path.exists():
+            return None
+
+        try:
+            with path.open("r", encoding="utf8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+
+        return entry.get("value")
+
+    def _set_exact(self, key: str, value: str) -> None:
+        if self._redis is not None:
+            try:
+                self._redis.set(KEY_PREFIX + key, value, ex=self.ttl)
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache write failed: {e}")
+            return
+
+        path = self.cache_dir / f"{key}.json"
+        tmp = path.with_suffix(".tmp")
+        try:
+            with tmp.open("w", encoding="utf8") as f:
+                json.dump({"created": time.time(), "value": value}, f, ensure_ascii=False)
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"File cache write failed for {path}: {e}")
+
+    # ============================================
+    # Semantic tier (Redis search only)
+    # ============================================
+    def _semantic_enabled(self) -> bool:
+        return (
+            settings.llm_semantic_cache
+            and HAS_REDIS_SEARCH
+            and self._redis is not None
+            and self.encoder is not None
+        )
+
+    def _scope_tag(self, scope: str) -> str:
+        # Hex digest so the tag never needs query escaping
+        return hashlib.sha256(f"{self.model}|{scope}".encode("utf8")).hexdigest()[:16]
+
+    def _encode(self, text: str) -> np.ndarray:
+        emb = np.asarray(self.encoder(text), dtype=np.float32)
+        norm = np.linalg.norm(emb)
+        return emb / norm if norm > 0 else emb
+
+    def _ensure_index(self, dim: int) -> bool:
+        if self._index_ready:
+            return True
+
+        try:
+            self._redis.ft(SEMANTIC_INDEX).info()
+        except redis.ResponseError:
+            try:
+                self._redis.ft(SEMANTIC_INDEX).create_index(
+                    [
+                        TagField("scope"),
+                        VectorField(
+                            "embedding",
+                            "HNSW",
+                            {"TYPE": "FLOAT32", "DIM": dim, "DISTANCE_METRIC": "COSINE"}
+                        ),
+                    ],
+                    definition=IndexDefinition(prefix=[SEMANTIC_PREFIX], index_type=IndexType.HASH)
+                )
+                logger.info(f"Created Redis semantic index '{SEMANTIC_INDEX}' (dim={dim})")
+            except redis.RedisError as e:
+                logger.warning(f"Semantic cache disabled, index creation failed: {e}")
+                return False
+        except redis.RedisError as e:
+            logger.warning(f"Semantic cache unavailable: {e}")
+            return False
+
+        self._index_ready = True
+        return True
+
+    def _get_semantic(self, text: str, scope: str) -> Optional[str]:
+        try:
+            emb = self._encode(text)
+            if not self._ensure_index(emb.shape[0]):
+                return None
+
+            query = (
+                Query(f"(@scope:{{{self._scope_tag(scope)}}})=>[KNN 1 @embedding $vec AS dist]")
+                .return_fields("value", "dist")
+                .dialect(2)
+            )
+            res = self._redis.ft(SEMANTIC_INDEX).search(query, query_params={"vec": emb.tobytes()})
+        except redis.RedisError as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if not res.docs:
+            return None
+
+        doc = res.docs[0]
+        similarity = 1.0 - float(doc.dist)
+        if similarity < self.semantic_threshold:
+            return None
+
+        logger.info(f"Semantic cache hit for '{text}' (similarity={similarity:.3f})")
+        return doc.value
+
+    def _set_semantic(self, key: str, value: str, text: str, scope: str) -> None:
+        try:
+            emb = self._encode(text)
+            if not self._ensure_index(emb.shape[0]):
+                return
+
+            name = SEMANTIC_PREFIX + key
+            self._redis.hset(name, mapping={
+                "scope": self._scope_tag(scope),
+                "value": value,
+                "embedding": emb.tobytes(),
+            })
+            self._redis.expire(name, self.ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Semantic cache write failed: {e}")
@@ -4,31 +4,55 @@ Optimized for OpenRouter API usage.
 """
 from fastapi import FastAPI, HTTPException, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
 from typing import List
+import asyncio
 import logging
-import json
+import logging.handlers
+import queue
+import threading
+
+import numpy as np
+import orjson
 
 from api import settings
 from api import utils
 from api.models import TimelineResponse
+from api.embedding_batcher import EmbeddingBatcher
+from api.onnx_encoder import ONNXSentenceEncoder
 from api.etymology_service import etymology_service, OpenRouterError
 
-# Setup logging
-logging.basicConfig(
-    level=settings.log_level,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(settings.log_file),
-        logging.StreamHandler()
-    ]
+# Setup logging: request handlers only enqueue records, a background
+# listener thread does the file/console writes
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler(settings.log_file),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # real formatting happens in the listener
+logging.basicConfig(level=settings.log_level, handlers=[_queue_handler])
+# Started in startup_event, i.e. in each worker after any fork, so no thread
+# is running when `gunicorn --preload` forks; records logged before that
+# wait in the queue
+log_listener = logging.handlers.QueueListener(
+    _log_queue, *_log_handlers, respect_handler_level=True
 )
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Echoes Backend",
     version="1.1.0",
-    description="Track semantic evolution of concepts across time using OpenRouter LLMs"
+    description="Track semantic evolution of concepts across time using OpenRouter LLMs",
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
@@ -42,28 +66,94 @@ app.add_middleware(
 
 # Lazy model loading
 _model = None
+_model_lock = threading.Lock()
 
 def get_model() -> SentenceTransformer:
     """Load sentence transformer model on first use."""
     global _model
     if _model is None:
-        logger.info(f"Loading sentence transformer: {settings.sentence_transformer_model}")
-        _model = SentenceTransformer(settings.sentence_transformer_model)
-        logger.info("Model loaded successfully")
+        # Several worker threads may ask for the model at once on cold start
+        with _model_lock:
+            if _model is None:
+                if settings.embedding_backend == "onnx_int8":
+                    logger.info(f"Loading int8 ONNX encoder from {settings.onnx_model_dir}")
+                    _model = ONNXSentenceEncoder(settings.onnx_model_dir)
+                else:
+                    logger.info(f"Loading sentence transformer: {settings.sentence_transformer_model}")
+                    _model = SentenceTransformer(settings.sentence_transformer_model)
+                logger.info("Model loaded successfully")
     return _model
 
 
+# Load at import time so `gunicorn --preload` loads the weights once in the
+# master and forked workers share them copy-on-write
+if settings.preload_model:
+    get_model()
+
+
+# Coalesces concurrent encodes into micro-batches off the event loop
+embedding_batcher = EmbeddingBatcher(
+    get_model,
+    max_batch=settings.embed_max_batch,
+    max_wait=settings.embed_max_wait_ms / 1000
+)
+
+# Used to check /timeline payloads when VALIDATE_RESPONSES is on
+_timeline_adapter = TypeAdapter(TimelineResponse)
+
+# Query embeddings for concept names, most recently used last
+_concept_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+
+async def encode_concept(concept: str) -> np.ndarray:
+    """
+    Encode a concept name, reusing cached embeddings.
+    
+    Concepts come from a small vocabulary (embedding directory names),
+    so most /timeline and /era requests skip the transformer entirely.
+    """
+    norm = concept.strip().lower()
+    
+    emb = _concept_embeddings.get(norm)
+    if emb is not None:
+        _concept_embeddings.move_to_end(norm)
+        return emb
+    
+    emb = await embedding_batcher.encode(norm)
+    emb.setflags(write=False)  # shared between requests
+    
+    _concept_embeddings[norm] = emb
+    if len(_concept_embeddings) > settings.CONCEPT_CACHE_SIZE:
+        _concept_embeddings.popitem(last=False)
+    
+    return emb
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
+    log_listener.start()
     logger.info("="*60)
     logger.info("Starting Echoes Backend v1.1.0")
     logger.info("="*60)
     logger.info(f"OpenRouter Model: {settings.openrouter_model}")
     logger.info(f"LLM Etymology: {settings.use_llm_etymology}")
-    logger.info(f"Response Caching: {settings.cache_llm_responses}")
+    logger.info(f"Response Caching: {settings.cache_llm_responses} ({etymology_service.cache.backend})")
+    if settings.llm_semantic_cache:
+        # Cache lookups run in to_thread workers; the batcher keeps model use on one thread
+        etymology_service.cache.encoder = embedding_batcher.encode_blocking
+        logger.info(f"Semantic Cache: threshold {settings.llm_semantic_threshold}")
     logger.info(f"CORS Origins: {settings.cors_origins}")
     logger.info("="*60)
+    await embedding_batcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background resources on shutdown."""
+    await embedding_batcher.stop()
+    await etymology_service.aclose()
+    log_listener.stop()  # flushes queued records
 
 
 @app.get("/")
@@ -86,12 +176,13 @@ def health():
         "version": "1.1.0",
         "model": settings.openrouter_model,
         "llm_enabled": settings.use_llm_etymology,
-        "cache_enabled": settings.cache_llm_responses
+        "cache_enabled": settings.cache_llm_responses,
+        "cache_backend": etymology_service.cache.backend
     }
 
 
 @app.post("/embed")
-def embed_text(text: str = Body(..., embed=True)):
+async def embed_text(text: str = Body(..., embed=True)):
     """
     Generate embedding for arbitrary text.
     
@@ -105,8 +196,7 @@ def embed_text(text: str = Body(..., embed=True)):
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
     try:
-        model = get_model()
-        emb = model.encode(text)
+        emb = await embedding_batcher.encode(text)
         return {
             "embedding": emb.tolist(),
             "text": text,
@@ -121,7 +211,7 @@ def embed_text(text: str = Body(..., embed=True)):
 
 
 @app.get("/timeline", response_model=TimelineResponse)
-def timeline(
+async def timeline(
     concept: str = Query(..., description="Concept name (e.g., 'freedom')"),
     top_n: int = Query(
         settings.DEFAULT_TOP_N,
@@ -149,14 +239,21 @@ def timeline(
         )
     
     try:
-        model = get_model()
-        query_emb = model.encode(concept)
-        timeline_data = utils.build_timeline_for_query(
+        query_emb = await encode_concept(concept)
+        # Era loading and scoring do file I/O, keep them off the event loop
+        timeline_data = await asyncio.to_thread(
+            utils.build_timeline_for_query,
             concept,
             query_emb.tolist(),
             top_n=top_n
         )
-        return timeline_data
+        # Not part of TimelineResponse; surfaced as an HTTP error below
+        error = timeline_data.pop("error", None)
+        
+        if settings.validate_responses:
+            timeline_data = _timeline_adapter.dump_python(
+                _timeline_adapter.validate_python(timeline_data)
+            )
     
     except Exception as e:
         logger.error(f"Error building timeline for '{concept}': {e}")
@@ -164,10 +261,21 @@ def timeline(
             status_code=500,
             detail=f"Failed to build timeline: {str(e)}"
         )
+    
+    if error is not None:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to build timeline: {error}"
+        )
+    
+    # Returning a response directly skips FastAPI's response_model
+    # validation and jsonable_encoder pass, so the payload must already
+    # match the schema the model documents in OpenAPI
+    return ORJSONResponse(timeline_data)
 
 
 @app.get("/era")
-def era(
+async def era(
     concept: str = Query(..., description="Concept name"),
     era: str = Query(..., description="Era name (e.g., '1900s')"),
     top_n: int = Query(10, ge=1, le=100, description="Number of top items")
@@ -183,10 +291,10 @@ def era(
     Returns:
         Top similar items for the specified era
     """
-    era_file = f"{era}.json" if not era.endswith(".json") else era
+    era_name = era[:-len(".json")] if era.endswith(".json") else era
     
     try:
-        items = utils.load_era_items(concept, era_file)
+        matrix = await asyncio.to_thread(utils.load_era_matrix, concept, era_name)
     except FileNotFoundError:
         raise HTTPException(
             status_code=404,
@@ -200,15 +308,16 @@ def era(
         )
     
     try:
-        model = get_model()
-        query_emb = model.encode(concept)
-        top = utils.top_similar_in_era(query_emb.tolist(), items, top_n=top_n)
+        query_emb = await encode_concept(concept)
+        top = await asyncio.to_thread(
+            utils.top_similar_in_era, query_emb, matrix, top_n=top_n
+        )
         
         return {
             "concept": concept,
             "era": era,
             "top": top,
-            "total_items": len(items)
+            "total_items": len(matrix.ids)
         }
     except Exception as e:
         logger.error(f"Error computing similarities: {e}")
@@ -258,7 +367,7 @@ async def generate_evolution(
             f"Generating evolution for '{word}' across {len(eras)} eras"
         )
         
-        evolution_data = etymology_service.generate_word_evolution(
+        evolution_data = await etymology_service.generate_word_evolution(
             word=word,
             eras=eras,
             num_examples=num_examples
@@ -300,6 +409,170 @@ async def generate_evolution(
         )
 
 
+@app.post("/generate-evolution-stream")
+async def generate_evolution_stream(
+    word: str = Body(..., description="Word to analyze", min_length=1, max_length=100),
+    eras: List[str] = Body(..., description="List of eras", min_length=1),
+    num_examples: int = Body(
+        settings.DEFAULT_EXAMPLES_PER_ERA,
+        ge=1,
+        le=settings.MAX_EXAMPLES_PER_ERA,
+        description="Examples per era"
+    )
+):
+    """
+    Stream word evolution data as newline-delimited JSON.
+    
+    Emits one line per era, {"era": ..., "examples": [...]}, as soon as the
+    LLM finishes generating it, instead of waiting for the whole response.
+    If the stream fails midway, a final {"error": ...} line is emitted.
+    
+    Args:
+        word: Word to analyze
+        eras: List of time periods (e.g., ["1900s", "1950s", "2020s"])
+        num_examples: Number of examples per era (1-20)
+    
+    Raises:
+        400: Invalid input
+        500: LLM API error
+        504: Timeout before the first era arrived
+    """
+    if not settings.use_llm_etymology:
+        raise HTTPException(
+            status_code=503,
+            detail="LLM etymology is disabled in configuration"
+        )
+    
+    stream = etymology_service.stream_word_evolution(word, eras, num_examples)
+    
+    # Pull the first era before responding so early failures get a status code
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except ValueError as e:
+        logger.warning(f"Invalid input for '{word}': {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except OpenRouterError as e:
+        logger.error(f"OpenRouter API error for '{word}': {e}")
+        raise HTTPException(status_code=500, detail=f"LLM API error: {str(e)}")
+    except TimeoutError:
+        logger.error(f"OpenRouter request timed out for '{word}'")
+        raise HTTPException(
+            status_code=504,
+            detail=f"Request timed out after {settings.llm_timeout}s"
+        )
+    
+    async def generate():
+        try:
+            if first is None:
+                return
+            era_name, examples = first
+            yield orjson.dumps({"era": era_name, "examples": examples}) + b"\n"
+            async for era_name, examples in stream:
+                yield orjson.dumps({"era": era_name, "examples": examples}) + b"\n"
+        except (OpenRouterError, TimeoutError, ValueError) as e:
+            logger.error(f"Evolution stream for '{word}' failed: {e}")
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.post("/generate-evolution-batch")
+async def generate_evolution_batch(
+    words: List[str] = Body(
+        ...,
+        description="Words to analyze",
+        min_length=1,
+        max_length=settings.MAX_BATCH_WORDS
+    ),
+    eras: List[str] = Body(..., description="List of eras", min_length=1),
+    num_examples: int = Body(
+        settings.DEFAULT_EXAMPLES_PER_ERA,
+        ge=1,
+        le=settings.MAX_EXAMPLES_PER_ERA,
+        description="Examples per era"
+    )
+):
+    """
+    Generate evolution data for several words with batched LLM calls.
+
+    Batching shares the instruction prompt and network round-trip across
+    words, which is considerably cheaper than one /generate-evolution
+    call per word. Words are split into as few calls as fit the
+    LLM_BATCH_MAX_TOKENS output budget.
+
+    Args:
+        words: Words to analyze
+        eras: List of time periods (e.g., ["1900s", "1950s", "2020s"])
+        num_examples: Number of examples per era (1-20)
+
+    Returns:
+        Evolution data keyed by word, then by era
+
+    Raises:
+        400: Invalid input
+        500: LLM API error or timeout
+    """
+    if not settings.use_llm_etymology:
+        raise HTTPException(
+            status_code=503,
+            detail="LLM etymology is disabled in configuration"
+        )
+
+    try:
+        logger.info(
+            f"Generating batched evolution for {len(words)} words across {len(eras)} eras"
+        )
+
+        evolution_data = await etymology_service.generate_word_evolution_batch(
+            words=words,
+            eras=eras,
+            num_examples=num_examples
+        )
+
+        total_examples = sum(
+            len(examples)
+            for word_data in evolution_data.values()
+            for examples in word_data.values()
+        )
+
+        return {
+            "words": list(evolution_data.keys()),
+            "eras": eras,
+            "evolution": evolution_data,
+            "total_examples": total_examples,
+            "model": settings.openrouter_model
+        }
+
+    except ValueError as e:
+        logger.warning(f"Invalid batch input {words}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except OpenRouterError as e:
+        logger.error(f"OpenRouter API error for batch {words}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"LLM API error: {str(e)}"
+        )
+
+    except TimeoutError:
+        logger.error(f"OpenRouter request timed out for batch {words}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"Request timed out after {settings.llm_timeout}s"
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error generating batched evolution for {words}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
 @app.post("/build-embeddings")
 async def build_embeddings_endpoint(
     word: str = Body(..., min_length=1, max_length=100),
@@ -316,7 +589,9 @@ async def build_embeddings_endpoint(
     This combines /generate-evolution with embedding creation:
     1. Uses LLM to generate contextual examples
     2. Creates embeddings for each example
-    3. Saves to JSON files in embeddings/<word>/<era>.json
+    3. Saves embeddings/<word>/<era>.npy (float32 matrix), <era>.norm.npy
+       (unit rows) and embeddings/<word>/<era>.json (item metadata)
+    4. Restacks the unit rows of all the word's eras for /timeline
     
     Args:
         word: Word to analyze
@@ -324,9 +599,12 @@ async def build_embeddings_endpoint(
         num_examples: Examples per era
     
     Returns:
-        Information about created embedding files
+        Information about created embedding files. ``eras`` lists the eras
+        that were built and ``failed_eras`` those the LLM returned no
+        examples for.
     """
-    # First, generate the evolution data
+    # First, generate the evolution data in one multi-era call, which shares
+    # the prompt (and cache entry) with /generate-evolution
     try:
         evolution_result = await generate_evolution(word, eras, num_examples)
         evolution_data = evolution_result["evolution"]
@@ -341,57 +619,81 @@ async def build_embeddings_endpoint(
     
     # Now create embeddings for each era
     try:
-        model = get_model()
         concept_dir = settings.embeddings_path / word
         concept_dir.mkdir(parents=True, exist_ok=True)
         
         embeddings_created = []
+        built_eras = []
+        failed_eras = []
         total_items = 0
         
         for era in eras:
-            if era not in evolution_data:
-                logger.warning(f"No data for era {era}, skipping")
-                continue
-            
-            texts = evolution_data[era]
+            texts = evolution_data.get(era)
             if not texts:
+                logger.warning(f"No data for era {era}, skipping")
+                failed_eras.append(era)
                 continue
             
             # Generate embeddings
             logger.info(f"Generating {len(texts)} embeddings for {word}/{era}")
-            embs = model.encode(texts, show_progress_bar=False)
+            embs = await embedding_batcher.encode_many(texts)
+            
+            embs = np.asarray(embs, dtype=np.float32)
             
             # Create items
             items = []
-            for i, (text, emb) in enumerate(zip(texts, embs)):
+            for i, text in enumerate(texts):
                 items.append({
                     "id": f"{word}_{era}_{i}",
                     "text": text,
-                    "era": era,
-                    "embedding": emb.tolist()
+                    "era": era
                 })
             
-            # Save to JSON
+            # Validated once here so readers can skip per-item checks
+            utils.validate_era(items, embs)
+            
+            # Embeddings go to a binary matrix, JSON keeps only metadata
+            matrix_path = concept_dir / f"{era}.npy"
+            await asyncio.to_thread(utils.save_embedding_matrix, matrix_path, embs)
+            # Unit rows are stored too so workers memory-map rather than recompute them
+            normalized_path = concept_dir / f"{era}.norm.npy"
+            await asyncio.to_thread(
+                utils.save_embedding_matrix, normalized_path, utils.normalize_rows(embs)
+            )
+            
+            # Save to JSON (written last: readers list the .json files)
             output_path = concept_dir / f"{era}.json"
-            with output_path.open("w", encoding="utf8") as f:
-                json.dump({
-                    "items": items,
-                    "meta": {
-                        "concept": word,
-                        "era": era,
-                        "count": len(items),
-                        "model": settings.openrouter_model,
-                        "embedding_model": settings.sentence_transformer_model
-                    }
-                }, f, ensure_ascii=False, indent=2)
+            payload = orjson.dumps({
+                "items": items,
+                "meta": {
+                    "concept": word,
+                    "era": era,
+                    "count": len(items),
+                    "model": settings.openrouter_model,
+                    "embedding_model": settings.sentence_transformer_model,
+                    "embedding_backend": settings.embedding_backend,
+                    "embeddings_file": matrix_path.name,
+                    "normalized_file": normalized_path.name,
+                    "dimensions": int(embs.shape[1]),
+                    "validated": True,
+                    "schema_version": utils.SCHEMA_VERSION
+                }
+            })
+            await asyncio.to_thread(output_path.write_bytes, payload)
             
             embeddings_created.append(str(output_path))
+            built_eras.append(era)
             total_items += len(items)
             logger.info(f"Created embeddings file: {output_path}")
         
+        # Stack every era of the concept for /timeline to memory-map
+        await asyncio.to_thread(utils.save_concept_matrix, concept_dir)
+        utils.clear_era_caches()
+        
         return {
             "word": word,
-            "eras": eras,
+            "eras": built_eras,
+            "failed_eras": failed_eras,
             "embeddings_files": embeddings_created,
             "total_items": total_items,
             "llm_model": settings.openrouter_model,
@@ -0,0 +1,92 @@
+"""
+ONNX Runtime stand-in for SentenceTransformer.encode.
+Runs an int8-quantized export of the embedding model (see
+scripts/quantize_model.py) with the same mean pooling as the
+sentence-transformers pipeline.
+"""
+from pathlib import Path
+from typing import List, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+class ONNXSentenceEncoder:
+    """Minimal SentenceTransformer-compatible encoder backed by ONNX Runtime."""
+
+    def __init__(self, model_dir: Union[str, Path], max_seq_length: int = 128):
+        """
+        Args:
+            model_dir: Directory written by scripts/quantize_model.py
+            max_seq_length: Token limit, matching the source model's config
+
+        Raises:
+            ImportError: If optimum[onnxruntime] is not installed
+            FileNotFoundError: If the quantized model is missing
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The onnx_int8 embedding backend requires optimum[onnxruntime]"
+            ) from e
+
+        model_dir = Path(model_dir)
+        if not (model_dir / QUANTIZED_FILE_NAME).exists():
+            raise FileNotFoundError(
+                f"Quantized model not found in {model_dir}. "
+                f"Run scripts/quantize_model.py first"
+            )
+
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name=QUANTIZED_FILE_NAME
+        )
+        logger.info(f"Loaded int8 ONNX embedding model from {model_dir}")
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Encode text(s) into mean-pooled float32 embeddings.
+
+        Mirrors SentenceTransformer.encode: a single string returns a 1-D
+        vector, a list returns a (len, dim) matrix. Outputs are not
+        normalized, matching paraphrase-MiniLM-L6-v2's pipeline.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            outputs = self.model(**inputs)
+            tokens = np.asarray(outputs.last_hidden_state, dtype=np.float32)
+
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            summed = (tokens * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(summed / counts)
+
+        if batches:
+            embs = np.concatenate(batches)
+        else:
+            embs = np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+        return embs[0] if single else embs
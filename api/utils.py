@@ -3,21 +3,47 @@ Utility functions: loading era embeddings, similarity search, drift/shift comput
 Enhanced with better error handling and validation.
 """
 from pathlib import Path
-import json
+import math
+import os
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from functools import lru_cache
-from typing import List, Dict, Any, Optional
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, Tuple
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 BASE_EMBED_DIR = Path("embeddings")
 
+# Era files at this version carry meta.validated when checked at ingest
+SCHEMA_VERSION = 2
+
+# Stacked unit rows of every era of a concept, written by save_concept_matrix.
+# The index is not a .json file, so list_eras never mistakes it for an era.
+CONCEPT_MATRIX_FILE = "_concept.norm.npy"
+CONCEPT_INDEX_FILE = "_concept.index"
+
 class EmbeddingValidationError(Exception):
     """Raised when embedding data is malformed or missing required fields."""
     pass
 
+class EraMatrix(NamedTuple):
+    """An era's items stacked into one embedding matrix, with derived stats."""
+    era: str
+    ids: List[Any]
+    texts: List[str]
+    X: np.ndarray                   # (n, dim) embeddings
+    X_norm: np.ndarray              # (n, dim) float32 unit rows for cosine search
+    centroid: Optional[np.ndarray]  # (dim,) mean embedding, None if empty
+
+class ConceptMatrix(NamedTuple):
+    """Every era of a concept stacked into one matrix for a single GEMV per query."""
+    eras: List[EraMatrix]
+    X_all: np.ndarray    # (total, dim) float32 unit rows, eras concatenated in order
+    offsets: np.ndarray  # (len(eras) + 1,) row offsets; era i is X_all[offsets[i]:offsets[i+1]]
+
 def validate_item(item: Dict[str, Any], index: int) -> None:
     """Validate that an item has required fields with correct types."""
     required_fields = ["id", "text", "embedding"]
@@ -38,49 +64,127 @@ def validate_item(item: Dict[str, Any], index: int) -> None:
             f"Item {item['id']} has empty embedding"
         )
 
+def validate_era(items: List[Dict[str, Any]], X: np.ndarray) -> None:
+    """
+    Validate an era once at ingest, before its files are written.
+    
+    Raises:
+        EmbeddingValidationError: If the matrix and items don't line up,
+            an item is malformed, or an embedding is not finite
+    """
+    if X.ndim != 2 or X.shape[0] != len(items):
+        raise EmbeddingValidationError(
+            f"Embedding matrix has shape {X.shape} for {len(items)} items"
+        )
+    if not np.isfinite(X).all():
+        raise EmbeddingValidationError("Embedding matrix contains NaN or inf values")
+    for i, (item, row) in enumerate(zip(items, X)):
+        validate_item({**item, "embedding": row}, i)
+
 def load_era_items(concept: str, era_file: str) -> List[Dict[str, Any]]:
     """
     Load items from embeddings/<concept>/<era_file>.json
     era_file should include .json suffix (e.g., '1900s.json')
     
+    If the metadata names an embeddings file (a float32 .npy matrix), it is
+    memory-mapped and each item's "embedding" is a row view into it.
+    
     Raises:
         FileNotFoundError: If the file doesn't exist
         EmbeddingValidationError: If data format is invalid
     """
+    return _read_era(concept, era_file)[0]
+
+def _read_era(
+    concept: str, 
+    era_file: str
+) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Parse an era file into (valid_items, X, X_norm).
+    
+    X and X_norm are the memory-mapped .npy matrices named in the metadata,
+    or None when the era has none (or some items were dropped and the rows
+    no longer line up).
+    """
     p = BASE_EMBED_DIR / concept / era_file
     if not p.exists():
         raise FileNotFoundError(f"Embedding file not found: {p}")
     
     try:
-        with p.open("r", encoding="utf8") as f:
-            js = json.load(f)
-    except json.JSONDecodeError as e:
+        js = orjson.loads(p.read_bytes())
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON from {p}: {e}")
         raise EmbeddingValidationError(f"Invalid JSON in {p}: {e}")
     
     items = js.get("items", [])
+    meta = js.get("meta", {})
+    X = X_norm = None
+    
+    embeddings_file = meta.get("embeddings_file")
+    if embeddings_file:
+        X = load_embedding_matrix(p.parent / embeddings_file)
+        if X.shape[0] != len(items):
+            raise EmbeddingValidationError(
+                f"{embeddings_file} has {X.shape[0]} rows but {p} has {len(items)} items"
+            )
+        for item, row in zip(items, X):
+            item["embedding"] = row
+        
+        normalized_file = meta.get("normalized_file")
+        if normalized_file:
+            X_norm = load_embedding_matrix(p.parent / normalized_file)
+            if X_norm.shape != X.shape:
+                raise EmbeddingValidationError(
+                    f"{normalized_file} has shape {X_norm.shape}, expected {X.shape}"
+                )
     
-    # Validate each item
+    # Files validated at ingest are trusted as-is
+    if X is not None and meta.get("validated") and meta.get("schema_version", 1) >= SCHEMA_VERSION:
+        return items, X, X_norm
+    
+    # Validate and filter in a single pass
+    valid_items = []
     for i, item in enumerate(items):
         try:
             validate_item(item, i)
         except EmbeddingValidationError as e:
             logger.warning(f"Skipping invalid item in {p}: {e}")
             continue
-    
-    # Filter out any items that failed validation
-    valid_items = [item for i, item in enumerate(items) 
-                   if all(field in item for field in ["id", "text", "embedding"])]
+        valid_items.append(item)
     
     if not valid_items:
         logger.warning(f"No valid items found in {p}")
     
-    return valid_items
+    if len(valid_items) != len(items):
+        X = X_norm = None
+    
+    return valid_items, X, X_norm
+
+def load_embedding_matrix(path: Path) -> np.ndarray:
+    """
+    Memory-map a 2-D float32 embedding matrix saved with np.save.
+    
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        EmbeddingValidationError: If the array is not a 2-D matrix
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Embedding matrix not found: {path}")
+    
+    try:
+        X = np.load(path, mmap_mode="r")
+    except ValueError as e:
+        raise EmbeddingValidationError(f"Invalid embedding matrix {path}: {e}")
+    
+    if X.ndim != 2:
+        raise EmbeddingValidationError(
+            f"Embedding matrix {path} has shape {X.shape}, expected 2-D"
+        )
+    return X
 
-@lru_cache(maxsize=128)
-def load_all_eras(concept: str) -> List[Dict[str, Any]]:
+def list_eras(concept: str) -> List[str]:
     """
-    Returns list of dicts: { era: '1900s', items: [...] }
+    Return the sorted era names (JSON file stems) for a concept.
     
     Raises:
         FileNotFoundError: If concept directory doesn't exist
@@ -88,90 +192,348 @@ def load_all_eras(concept: str) -> List[Dict[str, Any]]:
     base = BASE_EMBED_DIR / concept
     if not base.exists():
         raise FileNotFoundError(f"Concept directory not found: {base}")
+    return sorted(x.stem for x in base.iterdir() if x.suffix == ".json")
+
+# Cached loaders check a signature of the era JSON files (mtime + size), so
+# a rebuilt or edited era is reloaded on the next request in every worker.
+# The JSON is written after its .npy files, so it changes on every rebuild.
+# A concept's signature also covers its stacked index, so a freshly written
+# stack replaces the in-memory one built while it was stale.
+
+class _SignatureCache:
+    """
+    One entry per key, replaced as soon as the key's signature changes.
+    
+    Unlike an lru_cache keyed on the signature, a superseded entry, and the
+    memory maps of replaced files it holds, is dropped the first time any
+    worker sees the new signature.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any, signature: Any, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+        
+        # Loaded outside the lock: concept loads fan out to era loads
+        value = load()
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+_era_cache = _SignatureCache(maxsize=256)
+_concept_cache = _SignatureCache(maxsize=128)
+
+def _era_signature(concept: str, era: str) -> Tuple[int, int]:
+    p = BASE_EMBED_DIR / concept / f"{era}.json"
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Embedding file not found: {p}")
+    return st.st_mtime_ns, st.st_size
+
+def _concept_signature(concept: str) -> Tuple[Tuple[Tuple[str, int, int], ...], Optional[Tuple[int, int]]]:
+    """(era JSON signatures, stacked index mtime + size or None)."""
+    base = BASE_EMBED_DIR / concept
+    if not base.exists():
+        raise FileNotFoundError(f"Concept directory not found: {base}")
+    return _era_files_signature(base), _file_signature(base / CONCEPT_INDEX_FILE)
+
+def _era_files_signature(base: Path) -> Tuple[Tuple[str, int, int], ...]:
+    sig = []
+    for x in base.iterdir():
+        if x.suffix == ".json":
+            st = x.stat()
+            sig.append((x.name, st.st_mtime_ns, st.st_size))
+    return tuple(sorted(sig))
+
+def _file_signature(p: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def load_era_matrix(concept: str, era: str) -> EraMatrix:
+    """
+    Load an era once and keep its stacked embeddings, unit rows and centroid.
+    
+    Timeline and era queries reuse the cached matrix instead of re-parsing
+    JSON and re-stacking vectors on every call; it is reloaded when the era
+    file changes. Eras built by /build-embeddings keep X and X_norm
+    memory-mapped from their .npy files, so /era queries in every worker
+    read one page-cached copy.
+    
+    Raises:
+        FileNotFoundError: If the era file doesn't exist
+        EmbeddingValidationError: If data format is invalid
+    """
+    return _era_cache.get(
+        (concept, era), _era_signature(concept, era), lambda: _load_era_matrix(concept, era)
+    )
+
+def _load_era_matrix(concept: str, era: str) -> EraMatrix:
+    items, X, X_norm = _read_era(concept, f"{era}.json")
+    if X is None:
+        X = _to_numpy_embeddings(items)
+    if X.size == 0:
+        return EraMatrix(era, [], [], X, np.empty((0, 0), dtype=np.float32), None)
     
-    files = sorted([x.name for x in base.iterdir() if x.suffix == ".json"])
+    return EraMatrix(
+        era=era,
+        ids=[it["id"] for it in items],
+        texts=[it["text"] for it in items],
+        X=X,
+        X_norm=X_norm if X_norm is not None else normalize_rows(X),
+        centroid=compute_centroid(X)
+    )
+
+def normalize_rows(X: np.ndarray) -> np.ndarray:
+    """Return X scaled to unit rows as contiguous float32; zero rows stay zero."""
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return np.divide(X, np.maximum(norms, 1e-12), dtype=np.float32)
+
+def load_era_matrices(concept: str) -> List[EraMatrix]:
+    """
+    Return the cached EraMatrix of every non-empty era for a concept.
     
-    if not files:
-        logger.warning(f"No JSON files found in {base}")
+    Raises:
+        FileNotFoundError: If concept directory doesn't exist
+    """
+    eras = list_eras(concept)
+    if not eras:
+        logger.warning(f"No JSON files found in {BASE_EMBED_DIR / concept}")
         return []
     
-    result = []
-    for fn in files:
+    def load(era: str) -> Optional[EraMatrix]:
         try:
-            items = load_era_items(concept, fn)
-            if items:  # Only add eras with valid items
-                era_name = fn.replace(".json", "")
-                result.append({"era": era_name, "items": items})
+            return load_era_matrix(concept, era)
         except (FileNotFoundError, EmbeddingValidationError) as e:
-            logger.error(f"Failed to load era {fn}: {e}")
-            continue
+            logger.error(f"Failed to load era {era}: {e}")
+            return None
+    
+    # Cold eras load concurrently: file reads and numpy reductions release the GIL
+    with ThreadPoolExecutor(max_workers=min(len(eras), os.cpu_count() or 1)) as ex:
+        matrices = list(ex.map(load, eras))
+    
+    # Only add eras with valid items, in era order
+    return [m for m in matrices if m is not None and m.ids]
+
+def load_concept_matrix(concept: str) -> ConceptMatrix:
+    """
+    Stack the unit rows of all eras so a timeline query is one matrix-vector product.
+    Rebuilt when any era file of the concept is added, removed or changed.
+    
+    The stack written by save_concept_matrix is memory-mapped, so workers
+    share one page-cached copy. If it is missing or older than the era
+    files, the eras are stacked in memory instead.
+    
+    Raises:
+        FileNotFoundError: If concept directory doesn't exist
+        EmbeddingValidationError: If eras have different embedding dimensions
+    """
+    signature = _concept_signature(concept)
+    return _concept_cache.get(
+        concept, signature, lambda: _load_concept_matrix(concept, signature)
+    )
+
+def _load_concept_matrix(concept: str, signature: Tuple) -> ConceptMatrix:
+    eras = load_era_matrices(concept)
+    if not eras:
+        return ConceptMatrix([], np.empty((0, 0), dtype=np.float32), np.zeros(1, dtype=np.int64))
+    
+    offsets = np.cumsum([0] + [len(era.ids) for era in eras])
+    X_all = _load_stacked_matrix(concept, signature[0], eras, offsets)
+    if X_all is None:
+        logger.info(f"No current stacked matrix for '{concept}', stacking eras in memory")
+        try:
+            X_all = np.concatenate([era.X_norm for era in eras])
+        except ValueError as e:
+            raise EmbeddingValidationError(f"Eras of '{concept}' have mismatched dimensions: {e}")
+    
+    return ConceptMatrix(eras, X_all, offsets)
+
+def _load_stacked_matrix(
+    concept: str,
+    era_signature: Tuple,
+    eras: List[EraMatrix],
+    offsets: np.ndarray
+) -> Optional[np.ndarray]:
+    """Memory-map the stacked unit rows if they were written from the current era files."""
+    base = BASE_EMBED_DIR / concept
+    try:
+        index = orjson.loads((base / CONCEPT_INDEX_FILE).read_bytes())
+    except FileNotFoundError:
+        return None
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Ignoring unreadable {base / CONCEPT_INDEX_FILE}: {e}")
+        return None
     
-    return result
+    if (tuple(tuple(s) for s in index.get("signature", [])) != era_signature
+            or index.get("eras") != [era.era for era in eras]
+            or index.get("offsets") != offsets.tolist()):
+        return None
+    
+    try:
+        X_all = load_embedding_matrix(base / CONCEPT_MATRIX_FILE)
+    except (FileNotFoundError, EmbeddingValidationError) as e:
+        logger.warning(f"Ignoring stacked matrix for '{concept}': {e}")
+        return None
+    if X_all.shape[0] != offsets[-1]:
+        return None
+    return X_all
+
+def save_concept_matrix(concept_dir: Path) -> Optional[Path]:
+    """
+    Write the stacked unit rows of every era in concept_dir, plus their index.
+    
+    Call after all era files of the concept are written: the index records
+    their signatures, and load_concept_matrix only maps a current stack.
+    Eras without stored unit rows leave no stack to write.
+    
+    Returns:
+        Path of the stacked matrix, or None if nothing was stacked
+    """
+    era_signature = _era_files_signature(concept_dir)
+    names, parts = [], []
+    for name, _, _ in era_signature:
+        meta = orjson.loads((concept_dir / name).read_bytes()).get("meta", {})
+        normalized_file = meta.get("normalized_file")
+        if not normalized_file:
+            logger.warning(f"{concept_dir / name} has no unit rows, not stacking {concept_dir.name}")
+            return None
+        X_norm = load_embedding_matrix(concept_dir / normalized_file)
+        if len(X_norm):
+            names.append(name[:-len(".json")])
+            parts.append(X_norm)
+    if not parts:
+        return None
+    
+    try:
+        X_all = np.concatenate(parts)
+    except ValueError as e:
+        raise EmbeddingValidationError(f"Eras in {concept_dir} have mismatched dimensions: {e}")
+    
+    matrix_path = concept_dir / CONCEPT_MATRIX_FILE
+    save_embedding_matrix(matrix_path, X_all)
+    index = {
+        "eras": names,
+        "offsets": np.cumsum([0] + [len(X) for X in parts]).tolist(),
+        "signature": era_signature
+    }
+    # Written last and atomically: readers only trust a stack its index vouches for
+    index_path = concept_dir / CONCEPT_INDEX_FILE
+    tmp = index_path.with_name(index_path.name + ".tmp")
+    tmp.write_bytes(orjson.dumps(index))
+    os.replace(tmp, index_path)
+    return matrix_path
+
+def save_embedding_matrix(path: Path, X: np.ndarray) -> None:
+    """
+    Atomically write an embedding matrix with np.save.
+    
+    Cached eras keep their .npy memory-mapped, so the file is replaced
+    rather than truncated in place.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.save(f, X)
+    os.replace(tmp, path)
+
+def clear_era_caches() -> None:
+    """Drop all cached era and concept data."""
+    _era_cache.clear()
+    _concept_cache.clear()
 
 def _to_numpy_embeddings(items: List[Dict[str, Any]]) -> np.ndarray:
-    """Convert list of items with embeddings to numpy array."""
+    """Convert list of items with embeddings to one float32 (n, dim) array."""
     if not items:
-        return np.array([])
+        return np.array([], dtype=np.float32)
     
     try:
-        embs = [np.array(it["embedding"], dtype=float) for it in items]
-        return np.array(embs)
+        # One conversion of the whole block instead of an array per row
+        X = np.asarray([it["embedding"] for it in items], dtype=np.float32)
     except (KeyError, ValueError, TypeError) as e:
         raise EmbeddingValidationError(f"Failed to convert embeddings to numpy: {e}")
+    
+    # One shape check for the block replaces per-row length checks
+    if X.ndim != 2:
+        raise EmbeddingValidationError(
+            f"Embeddings stacked to shape {X.shape}, expected (items, dim)"
+        )
+    return X
+
+def normalize_query(query_emb: Any) -> np.ndarray:
+    """
+    Return query_emb as a float32 unit vector (a zero vector stays zero).
+    Already-normalized float32 arrays are returned without a copy.
+    """
+    q = np.asarray(query_emb, dtype=np.float32)
+    sq = float(np.vdot(q, q))
+    if abs(sq - 1.0) < 1e-6:
+        return q
+    return q / math.sqrt(sq + 1e-12)
 
 def top_similar_in_era(
     query_emb: List[float], 
-    items: List[Dict[str, Any]], 
+    matrix: EraMatrix, 
     top_n: int = 6
 ) -> List[Dict[str, Any]]:
     """
-    Return top_n items most similar to query_emb from items.
+    Return top_n items most similar to query_emb from an era matrix.
     Each returned item: {id, text, score}
     """
-    if not items:
+    if not matrix.ids:
         logger.warning("No items provided for similarity search")
         return []
     
-    if not query_emb:
+    if query_emb is None or len(query_emb) == 0:
         logger.error("Empty query embedding provided")
         return []
     
-    try:
-        X = _to_numpy_embeddings(items)
-        if X.size == 0:
-            return []
-        
-        sims = cosine_similarity([query_emb], X)[0]
-        
-        # Handle case where top_n > number of items
-        actual_top_n = min(top_n, len(items))
-        idx = np.argsort(sims)[::-1][:actual_top_n]
-        
-        out = []
-        for i in idx:
-            out.append({
-                "id": items[i]["id"],
-                "text": items[i]["text"],
-                "score": float(sims[i])
-            })
-        return out
-    except EmbeddingValidationError as e:
-        logger.error(f"Error in similarity computation: {e}")
-        return []
+    # Rows are pre-normalized, so cosine similarity is one GEMV with a unit query
+    sims = matrix.X_norm @ normalize_query(query_emb)
+    
+    return _select_top(sims, matrix, top_n)
 
-def compute_centroid(items: List[Dict[str, Any]]) -> Optional[np.ndarray]:
-    """Compute the centroid (mean) of all item embeddings."""
-    if not items:
-        return None
+def _select_top(sims: np.ndarray, matrix: EraMatrix, top_n: int) -> List[Dict[str, Any]]:
+    """Return the top_n items of an era by descending similarity score."""
+    # Partial selection is O(N); only the winners get sorted
+    if top_n >= len(sims):
+        idx = np.argsort(sims)[::-1]
+    else:
+        idx = np.argpartition(sims, -top_n)[-top_n:]
+        idx = idx[np.argsort(sims[idx])[::-1]]
     
-    try:
-        X = _to_numpy_embeddings(items)
-        if X.size == 0:
-            return None
-        return np.mean(X, axis=0)
-    except EmbeddingValidationError as e:
-        logger.error(f"Failed to compute centroid: {e}")
+    out = []
+    for i in idx:
+        out.append({
+            "id": matrix.ids[i],
+            "text": matrix.texts[i],
+            "score": float(sims[i])
+        })
+    return out
+
+def compute_centroid(X: np.ndarray) -> Optional[np.ndarray]:
+    """Compute the centroid (mean) of a stacked embedding matrix."""
+    if X.size == 0:
         return None
+    return X.mean(axis=0, dtype=np.float32)
 
 def centroid_shift_score(centroid_a: Optional[np.ndarray], 
                          centroid_b: Optional[np.ndarray]) -> float:
@@ -183,14 +545,9 @@ def centroid_shift_score(centroid_a: Optional[np.ndarray],
     if centroid_a is None or centroid_b is None:
         return 0.0
     
-    try:
-        a = centroid_a.reshape(1, -1)
-        b = centroid_b.reshape(1, -1)
-        sim = cosine_similarity(a, b)[0][0]
-        return float(1.0 - sim)
-    except Exception as e:
-        logger.error(f"Error computing centroid shift: {e}")
-        return 0.0
+    # Plain 1-D dot products; a zero centroid has sim 0 rather than NaN
+    denom = math.sqrt(float(centroid_a @ centroid_a) * float(centroid_b @ centroid_b))
+    return 1.0 - float(centroid_a @ centroid_b) / max(denom, 1e-12)
 
 def build_timeline_for_query(
     concept: str, 
@@ -202,26 +559,33 @@ def build_timeline_for_query(
       { concept, timeline: [ { era, top: [{id,text,score}], centroid_shift_from_prev }, ... ] }
     """
     try:
-        eras = load_all_eras(concept)
-    except FileNotFoundError as e:
+        matrix = load_concept_matrix(concept)
+    except (FileNotFoundError, EmbeddingValidationError) as e:
         logger.error(f"Failed to load eras for concept '{concept}': {e}")
         return {"concept": concept, "timeline": [], "error": str(e)}
     
-    if not eras:
+    if not matrix.eras:
         logger.warning(f"No eras found for concept '{concept}'")
         return {"concept": concept, "timeline": []}
     
+    if query_emb is None or len(query_emb) == 0:
+        logger.error("Empty query embedding provided")
+        return {"concept": concept, "timeline": []}
+    
+    # Normalize once, score every era with one GEMV, then select per era from its slice
+    sims_all = matrix.X_all @ normalize_query(query_emb)
+    
     result = []
     prev_centroid = None
     
-    for era in eras:
-        items = era["items"]
-        top = top_similar_in_era(query_emb, items, top_n=top_n)
-        centroid = compute_centroid(items)
+    for i, era in enumerate(matrix.eras):
+        sims = sims_all[matrix.offsets[i]:matrix.offsets[i + 1]]
+        top = _select_top(sims, era, top_n)
+        centroid = era.centroid
         shift = centroid_shift_score(prev_centroid, centroid) if prev_centroid is not None else 0.0
         
         result.append({
-            "era": era["era"], 
+            "era": era.era, 
             "top": top, 
             "centroid_shift_from_prev": shift
         })
@@ -14,6 +14,8 @@ from typing import List
 
 
 BASE_URL = "http://localhost:8000"
+# Shared by every test call so requests reuse one keep-alive connection
+SESSION = requests.Session()
 
 
 def print_header(text: str):
@@ -32,7 +34,7 @@ def check_health():
     """Test health endpoint."""
     print_header("1. HEALTH CHECK")
     
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     data = response.json()
     
     print(f"Status: {data['status']}")
@@ -55,7 +57,7 @@ def test_generate_evolution(word: str, eras: List[str]):
     start = time.time()
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/generate-evolution",
             json={
                 "word": word,
@@ -107,7 +109,7 @@ def test_build_embeddings(word: str, eras: List[str]):
     start = time.time()
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/build-embeddings",
             json={
                 "word": word,
@@ -148,7 +150,7 @@ def test_timeline(concept: str):
     print_header(f"4. GET TIMELINE: '{concept.upper()}'")
     
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{BASE_URL}/timeline",
             params={"concept": concept, "top_n": 3}
         )
@@ -9,6 +9,8 @@ import requests
 import json
 
 BASE = "http://localhost:8000"
+# One pooled session keeps the connection alive across demo calls
+SESSION = requests.Session()
 
 def pretty(r):
     try:
@@ -18,21 +20,21 @@ def pretty(r):
 
 def run_demo():
     print("[1] Health check")
-    r = requests.get(f"{BASE}/health")
+    r = SESSION.get(f"{BASE}/health")
     print(pretty(r))
 
     concept = "freedom"
     print(f"\n[2] Timeline for concept='{concept}'")
-    r = requests.get(f"{BASE}/timeline", params={"concept": concept, "top_n": 5})
+    r = SESSION.get(f"{BASE}/timeline", params={"concept": concept, "top_n": 5})
     print(pretty(r))
 
     era = "1900s"
     print(f"\n[3] Era-specific top for {concept} / {era}")
-    r = requests.get(f"{BASE}/era", params={"concept": concept, "era": era, "top_n": 6})
+    r = SESSION.get(f"{BASE}/era", params={"concept": concept, "era": era, "top_n": 6})
     print(pretty(r))
 
     print("\n[4] Symbol pairs (example 'eye')")
-    r = requests.get(f"{BASE}/symbol-pairs", params={"symbol": "eye"})
+    r = SESSION.get(f"{BASE}/symbol-pairs", params={"symbol": "eye"})
     print(pretty(r))
 
 if __name__ == "__main__":
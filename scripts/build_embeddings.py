@@ -1,55 +1,120 @@
 #!/usr/bin/env python3
 """
-Precompute embeddings for each concept + era CSV and write JSON files to embeddings/<concept>/<era>.json
+Precompute embeddings for each concept + era CSV and write embeddings/<concept>/<era>.npy
+(float32 matrix) plus embeddings/<concept>/<era>.json (items + metadata), then restack
+every era of the concept into embeddings/<concept>/_concept.norm.npy for /timeline
 Usage:
   python scripts/build_embeddings.py --concept freedom --eras 1900s,2020s
+  python scripts/build_embeddings.py --concept freedom --eras 1900s,2020s --backend onnx_int8
+The onnx_int8 backend uses the model written by scripts/quantize_model.py and falls back
+to torch if optimum[onnxruntime] or the quantized model is missing.
 This script expects files named data/<era>_<concept>.csv (e.g. data/1900s_freedom.csv)
 """
 import argparse
-from sentence_transformers import SentenceTransformer
+import importlib.util
 from pathlib import Path
 import json
+import numpy as np
 
 MODEL_NAME = "paraphrase-MiniLM-L6-v2"  # small + fast for hackathon
+BATCH_SIZE = 64
+API_DIR = Path(__file__).resolve().parent.parent / "api"
+
+def load_api_module(name: str):
+    # Load api/<name>.py by path: importing the api package would load its settings
+    spec = importlib.util.spec_from_file_location(f"api_{name}", API_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Shared with the API so files are validated and written the way the server reads them
+utils = load_api_module("utils")
+
+def load_model(backend: str, onnx_model_dir: Path):
+    if backend == "onnx_int8":
+        onnx_encoder = load_api_module("onnx_encoder")
+        try:
+            model = onnx_encoder.ONNXSentenceEncoder(onnx_model_dir)
+            print(f"[INFO] Using int8 ONNX model from {onnx_model_dir}")
+            return model, backend
+        except (ImportError, FileNotFoundError) as e:
+            print(f"[WARN] {e} — falling back to torch")
+    # Imported lazily so the ONNX path never pays for loading torch
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME), "torch"
 
 def read_csv_lines(path: Path):
-    lines = []
-    with path.open("r", encoding="utf8") as f:
-        for ln in f:
-            ln = ln.strip()
-            if ln:
-                lines.append(ln)
-    return lines
+    # One read + C-level split instead of a Python loop over the file. Only
+    # \n, \r\n and \r end a line, as when iterating a text-mode file;
+    # splitlines() would also break on form feeds, U+2028 and the like
+    with path.open("rb") as f:
+        raw = f.read().decode("utf8")
+    lines = (ln.strip() for ln in raw.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return [ln for ln in lines if ln]
 
-def build_embeddings_for(concept: str, eras: list[str], out_base: Path, data_base: Path):
-    model = SentenceTransformer(MODEL_NAME)
+def build_embeddings_for(concept: str, eras: list[str], out_base: Path, data_base: Path,
+                         backend: str = "torch", onnx_model_dir: Path = Path("onnx_int8")):
+    model, backend = load_model(backend, onnx_model_dir)
+    # Gather every era first so the model sees one large batch
+    spans = []
+    all_texts = []
     for era in eras:
         csv_name = f"{era}_{concept}.csv"
         csv_path = data_base / csv_name
         if not csv_path.exists():
             print(f"[WARN] Missing data file: {csv_path} — skipping era {era}")
             continue
-        items = []
         texts = read_csv_lines(csv_path)
         if not texts:
             print(f"[WARN] No lines in {csv_path}; skipping.")
             continue
-        print(f"[INFO] Encoding {len(texts)} texts for {concept} / {era} ...")
-        embs = model.encode(texts, show_progress_bar=True)
-        for i, (t, e) in enumerate(zip(texts, embs)):
-            items.append({
-                "id": f"{concept}_{era}_{i}",
-                "text": t,
-                "era": era,
-                # convert to list for JSON serializable
-                "embedding": e.tolist() if hasattr(e, "tolist") else list(e)
-            })
-        out_dir = out_base / concept
-        out_dir.mkdir(parents=True, exist_ok=True)
+        spans.append((era, len(all_texts), len(all_texts) + len(texts)))
+        all_texts.extend(texts)
+    if not all_texts:
+        return
+    print(f"[INFO] Encoding {len(all_texts)} texts for {concept} across {len(spans)} eras ...")
+    all_embs = np.asarray(
+        model.encode(all_texts, batch_size=BATCH_SIZE, convert_to_numpy=True, show_progress_bar=True),
+        dtype=np.float32
+    )
+    out_dir = out_base / concept
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for era, start, end in spans:
+        embs = all_embs[start:end]
+        # Vectors stay in the float32 matrix; items carry only ids and text
+        items = [
+            {"id": f"{concept}_{era}_{i}", "text": t, "era": era}
+            for i, t in enumerate(all_texts[start:end])
+        ]
+        # Validated once here; the API trusts files marked validated
+        utils.validate_era(items, embs)
+        # Embeddings go to a binary matrix the API memory-maps; JSON keeps the rest.
+        # Files are replaced atomically: a running server may have them mapped.
+        matrix_path = out_dir / f"{era}.npy"
+        utils.save_embedding_matrix(matrix_path, embs)
+        # Unit rows for cosine search, memory-mapped by every API worker
+        normalized_path = out_dir / f"{era}.norm.npy"
+        utils.save_embedding_matrix(normalized_path, utils.normalize_rows(embs))
         out_path = out_dir / f"{era}.json"
+        meta = {
+            "concept": concept,
+            "era": era,
+            "count": len(items),
+            "embedding_model": MODEL_NAME,
+            "embedding_backend": backend,
+            "embeddings_file": matrix_path.name,
+            "normalized_file": normalized_path.name,
+            "dimensions": int(embs.shape[1]),
+            "validated": True,
+            "schema_version": utils.SCHEMA_VERSION
+        }
         with out_path.open("w", encoding="utf8") as f:
-            json.dump({"items": items, "meta": {"concept": concept, "era": era, "count": len(items)}}, f, ensure_ascii=False, indent=2)
+            json.dump({"items": items, "meta": meta}, f, ensure_ascii=False, separators=(",", ":"))
         print(f"[OK] Wrote {out_path}")
+    # Stack every era of the concept (including ones built earlier) for /timeline
+    stacked_path = utils.save_concept_matrix(out_dir)
+    if stacked_path is not None:
+        print(f"[OK] Wrote {stacked_path}")
 
 def main():
     parser = argparse.ArgumentParser()
@@ -57,9 +122,14 @@ def main():
     parser.add_argument("--eras", required=True, help="comma-separated list of eras (e.g. 1900s,1950s,2020s)")
     parser.add_argument("--data-dir", default="data", help="data folder")
     parser.add_argument("--out-dir", default="embeddings", help="embeddings output folder")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx_int8"],
+                        help="embedding backend")
+    parser.add_argument("--onnx-model-dir", default="onnx_int8",
+                        help="quantized model folder for the onnx_int8 backend")
     args = parser.parse_args()
     eras = [e.strip() for e in args.eras.split(",") if e.strip()]
-    build_embeddings_for(args.concept, eras, Path(args.out_dir), Path(args.data_dir))
+    build_embeddings_for(args.concept, eras, Path(args.out_dir), Path(args.data_dir),
+                         args.backend, Path(args.onnx_model_dir))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Export the sentence transformer to ONNX and apply dynamic int8 quantization.
+Usage:
+  python scripts/quantize_model.py --out-dir onnx_int8
+Then set EMBEDDING_BACKEND=onnx_int8 (and ONNX_MODEL_DIR if not onnx_int8).
+Requires: pip install "optimum[onnxruntime]"
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+MODEL_NAME = "sentence-transformers/paraphrase-MiniLM-L6-v2"
+
+QUANTIZATION_CONFIGS = {
+    "avx512_vnni": AutoQuantizationConfig.avx512_vnni,
+    "avx512": AutoQuantizationConfig.avx512,
+    "avx2": AutoQuantizationConfig.avx2,
+    "arm64": AutoQuantizationConfig.arm64,
+}
+
+def quantize(model_name: str, out_dir: Path, arch: str):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"[INFO] Exporting {model_name} to ONNX ...")
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(tmp)
+
+        print(f"[INFO] Quantizing to int8 ({arch}) ...")
+        qconfig = QUANTIZATION_CONFIGS[arch](is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(tmp)
+        quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(out_dir)
+    print(f"[OK] Wrote quantized model to {out_dir}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_NAME, help="Hugging Face model id")
+    parser.add_argument("--out-dir", default="onnx_int8", help="output folder")
+    parser.add_argument("--arch", default="avx512_vnni", choices=sorted(QUANTIZATION_CONFIGS),
+                        help="target CPU instruction set")
+    args = parser.parse_args()
+    quantize(args.model, Path(args.out_dir), args.arch)
+
+if __name__ == "__main__":
+    main()